@@ -1,3 +1,6 @@
+from contextlib import nullcontext
+from functools import partial
+
 import torch
 from torch import nn
 import torch.nn.functional as F
@@ -18,6 +21,13 @@ class MLP(nn.Module):
     non_linearity : default is F.gelu
     dropout : float, default is 0
         if > 0, dropout probability
+    autocast_dtype : torch.dtype, default is None
+        if not None, the forward pass is run under torch.autocast
+        with this dtype (e.g. torch.bfloat16) to use tensor cores.
+        The output is cast back to the dtype of the input
+    gelu_approx : bool, default is False
+        if True and non_linearity is F.gelu, use the cheaper
+        tanh approximation of the GELU
     """
 
     def __init__(
@@ -29,6 +39,8 @@ class MLP(nn.Module):
         n_dim=2,
         non_linearity=F.gelu,
         dropout=0.0,
+        autocast_dtype=None,
+        gelu_approx=False,
         **kwargs,
     ):
         super().__init__()
@@ -38,53 +50,77 @@ class MLP(nn.Module):
         self.hidden_channels = (
             in_channels if hidden_channels is None else hidden_channels
         )
-        self.non_linearity = non_linearity
-        self.dropout = (
-            nn.ModuleList([nn.Dropout(dropout) for _ in range(n_layers)])
-            if dropout > 0.0
-            else None
-        )
-        
-        # we use nn.Conv1d for everything and roll data along the 1st data dim
+        self.non_linearity = _tanh_gelu(non_linearity) if gelu_approx else non_linearity
+        self.dropout_p = dropout
+        self.autocast_dtype = autocast_dtype
+
+        # we use nn.Linear to hold the weights but apply them channels-first
         self.fcs = nn.ModuleList()
         for i in range(n_layers):
             if i == 0 and i == (n_layers - 1):
-                self.fcs.append(nn.Conv1d(self.in_channels, self.out_channels, 1))
+                self.fcs.append(nn.Linear(self.in_channels, self.out_channels))
             elif i == 0:
-                self.fcs.append(nn.Conv1d(self.in_channels, self.hidden_channels, 1))
+                self.fcs.append(nn.Linear(self.in_channels, self.hidden_channels))
             elif i == (n_layers - 1):
-                self.fcs.append(nn.Conv1d(self.hidden_channels, self.out_channels, 1))
+                self.fcs.append(nn.Linear(self.hidden_channels, self.out_channels))
             else:
-                self.fcs.append(nn.Conv1d(self.hidden_channels, self.hidden_channels, 1))
+                self.fcs.append(nn.Linear(self.hidden_channels, self.hidden_channels))
+
+    def _load_from_state_dict(self, state_dict, prefix, *args, **kwargs):
+        # checkpoints saved before the switch to nn.Linear store
+        # nn.Conv1d weights of shape (out, in, 1): drop the kernel dim
+        for i in range(self.n_layers):
+            key = f"{prefix}fcs.{i}.weight"
+            weight = state_dict.get(key)
+            if weight is not None and weight.ndim == 3:
+                state_dict[key] = weight.squeeze(-1)
+        super()._load_from_state_dict(state_dict, prefix, *args, **kwargs)
 
     def forward(self, x):
-        reshaped = False
-        size = list(x.shape)
-        if x.ndim > 3:  
-            # batch, channels, x1, x2... extra dims
-            # .reshape() is preferable but .view()
-            # cannot be called on non-contiguous tensors
-            x = x.reshape((*size[:2], -1)) 
-            reshaped = True
-
-        for i, fc in enumerate(self.fcs):
-            x = fc(x)
-            if i < self.n_layers - 1:
-                x = self.non_linearity(x)
-            if self.dropout is not None:
-                x = self.dropout[i](x)
+        # nullcontext rather than autocast(enabled=False), which would
+        # also switch off an autocast region entered by the caller
+        autocast_dtype = self.autocast_dtype
+        if autocast_dtype is None:
+            autocast = nullcontext()
+        else:
+            autocast = torch.autocast(x.device.type, dtype=autocast_dtype)
+        in_dtype = x.dtype
+
+        # batch, channels, x1, x2... -> batch, channels, n
+        # this is a view for contiguous inputs: the data stays channels-first
+        spatial = x.shape[2:]
+        x = x.flatten(2)
+        batch_size = x.shape[0]
+
+        fcs = self.fcs
+        dropout_p = self.dropout_p
+        with autocast:
+            # flat code paths for the common shallow MLPs without dropout
+            if not dropout_p and self.n_layers == 1:
+                x = _channel_linear(x, fcs[0], batch_size)
+            elif not dropout_p and self.n_layers == 2:
+                fc0, fc1 = fcs
+                x = self.non_linearity(_channel_linear(x, fc0, batch_size))
+                x = _channel_linear(x, fc1, batch_size)
+            else:
+                non_linearity = self.non_linearity
+                last = self.n_layers - 1
+                for i, fc in enumerate(fcs):
+                    x = _channel_linear(x, fc, batch_size)
+                    if i < last:
+                        x = non_linearity(x)
+                    if dropout_p:
+                        x = F.dropout(x, dropout_p, self.training)
 
-        # if x was an N-d tensor reshaped into 1d, undo the reshaping
-        # same logic as above: .reshape() handles contiguous tensors as well
-        if reshaped:
-            x = x.reshape((size[0], self.out_channels, *size[2:]))
+        if autocast_dtype is not None:
+            x = x.to(in_dtype)
 
-        return x
+        return x.unflatten(2, spatial)
 
 
-# Reimplementation of the MLP class using Linear instead of Conv
+# Reimplementation of the MLP class for channels-last inputs
 class MLPLinear(torch.nn.Module):
-    def __init__(self, layers, non_linearity=F.gelu, dropout=0.0):
+    def __init__(self, layers, non_linearity=F.gelu, dropout=0.0, gelu_approx=False):
         super().__init__()
 
         self.n_layers = len(layers) - 1
@@ -92,22 +128,38 @@ class MLPLinear(torch.nn.Module):
         assert self.n_layers >= 1
 
         self.fcs = nn.ModuleList()
-        self.non_linearity = non_linearity
-        self.dropout = (
-            nn.ModuleList([nn.Dropout(dropout) for _ in range(self.n_layers)])
-            if dropout > 0.0
-            else None
-        )
+        self.non_linearity = _tanh_gelu(non_linearity) if gelu_approx else non_linearity
+        self.dropout_p = dropout
 
         for j in range(self.n_layers):
             self.fcs.append(nn.Linear(layers[j], layers[j + 1]))
 
     def forward(self, x):
+        non_linearity = self.non_linearity
+        dropout_p = self.dropout_p
+        last = self.n_layers - 1
         for i, fc in enumerate(self.fcs):
-            x = fc(x)
-            if i < self.n_layers - 1:
-                x = self.non_linearity(x)
-            if self.dropout is not None:
-                x = self.dropout[i](x)
+            x = F.linear(x, fc.weight, fc.bias)
+            if i < last:
+                x = non_linearity(x)
+            if dropout_p:
+                x = F.dropout(x, dropout_p, self.training)
 
         return x
+
+
+def _channel_linear(x, fc, batch_size):
+    """Applies the nn.Linear fc to the channels of x, of shape (batch, channels, n)
+
+    A single batched GEMM with the bias fused in: unlike moving the channels last,
+    neither the input nor the output needs to be copied to a new layout
+    """
+    return torch.baddbmm(fc.bias.unsqueeze(-1), fc.weight.expand(batch_size, -1, -1), x)
+
+
+def _tanh_gelu(non_linearity):
+    """Swaps the exact, erf-based F.gelu for its tanh approximation
+    """
+    if non_linearity is F.gelu:
+        return partial(F.gelu, approximate="tanh")
+    return non_linearity
@@ -0,0 +1,113 @@
+import torch
+import torch.nn.functional as F
+from ..mlp import MLP, MLPLinear
+import pytest
+
+
+@pytest.mark.parametrize('n_dim', [1, 2, 3])
+@pytest.mark.parametrize('n_layers', [1, 2, 3])
+def test_MLP(n_dim, n_layers):
+    in_channels, out_channels = 3, 5
+    size = [6] * n_dim
+    mlp = MLP(in_channels, out_channels, hidden_channels=8, n_layers=n_layers)
+
+    x = torch.randn(2, in_channels, *size)
+    res = mlp(x)
+    assert list(res.shape) == [2, out_channels, *size]
+    # The output keeps the channels-first layout of the input
+    assert res.is_contiguous()
+
+    # Channels are mixed pointwise: must match MLPLinear on channels-last data
+    ref = MLPLinear([in_channels] + [8] * (n_layers - 1) + [out_channels])
+    ref.load_state_dict(mlp.state_dict())
+    ref_res = ref(x.movedim(1, -1)).movedim(-1, 1)
+    assert torch.allclose(res, ref_res, atol=1e-6)
+
+
+def test_MLP_conv1d_checkpoint():
+    """Checkpoints with (out, in, 1) Conv1d weights still load."""
+    mlp = MLP(3, 4, hidden_channels=6, n_layers=2)
+    state_dict = {k: (v.unsqueeze(-1) if k.endswith('weight') else v)
+                  for k, v in mlp.state_dict().items()}
+
+    loaded = MLP(3, 4, hidden_channels=6, n_layers=2)
+    loaded.load_state_dict(state_dict)
+
+    x = torch.randn(2, 3, 10)
+    assert torch.allclose(mlp(x), loaded(x))
+
+
+def test_MLP_dropout():
+    mlp = MLP(3, 4, n_layers=2, dropout=0.5)
+    x = torch.randn(2, 3, 10)
+
+    mlp.eval()
+    assert torch.equal(mlp(x), mlp(x))
+
+    mlp.train()
+    assert not torch.equal(mlp(x), mlp(x))
+
+
+@pytest.mark.parametrize('n_layers', [1, 2, 3])
+def test_MLP_dropout_set_after_init(n_layers):
+    """dropout_p is read on every call, whatever the number of layers"""
+    mlp = MLP(3, 4, n_layers=n_layers)
+    x = torch.randn(2, 3, 10)
+    assert torch.equal(mlp(x), mlp(x))
+
+    mlp.dropout_p = 0.5
+    assert not torch.equal(mlp(x), mlp(x))
+
+
+def test_MLP_autocast():
+    x = torch.randn(2, 3, 10, 10)
+    mlp = MLP(3, 4, n_layers=2)
+    ref = mlp(x)
+
+    autocast_mlp = MLP(3, 4, n_layers=2, autocast_dtype=torch.bfloat16)
+    autocast_mlp.load_state_dict(mlp.state_dict())
+    res = autocast_mlp(x)
+    assert res.dtype == x.dtype
+    assert torch.allclose(res, ref, atol=5e-2, rtol=5e-2)
+    # the matmuls ran in bfloat16: the result is not bit-identical to fp32
+    assert not torch.equal(res, ref)
+
+
+def test_MLP_gelu_approx():
+    x = torch.randn(2, 3, 10)
+    mlp = MLP(3, 4, n_layers=2)
+    approx_mlp = MLP(3, 4, n_layers=2, gelu_approx=True)
+    approx_mlp.load_state_dict(mlp.state_dict())
+
+    # Reference with the tanh GELU passed explicitly
+    tanh_mlp = MLP(3, 4, n_layers=2,
+                   non_linearity=lambda x: F.gelu(x, approximate="tanh"))
+    tanh_mlp.load_state_dict(mlp.state_dict())
+
+    res = approx_mlp(x)
+    assert torch.equal(res, tanh_mlp(x))
+    assert not torch.equal(res, mlp(x))
+    assert torch.allclose(res, mlp(x), atol=1e-2)
+
+    # Positional arguments keep their pre-existing meaning: 7th is dropout
+    positional_mlp = MLP(3, 4, 8, 2, 2, F.gelu, 0.1)
+    assert positional_mlp.dropout_p == 0.1
+    assert positional_mlp.non_linearity is F.gelu
+
+
+def test_MLPLinear_gelu_approx():
+    x = torch.randn(2, 10, 3)
+    mlp = MLPLinear([3, 8, 4])
+    approx_mlp = MLPLinear([3, 8, 4], gelu_approx=True)
+    approx_mlp.load_state_dict(mlp.state_dict())
+
+    tanh_mlp = MLPLinear([3, 8, 4],
+                         non_linearity=lambda x: F.gelu(x, approximate="tanh"))
+    tanh_mlp.load_state_dict(mlp.state_dict())
+
+    res = approx_mlp(x)
+    assert torch.equal(res, tanh_mlp(x))
+    assert not torch.equal(res, mlp(x))
+
+    # Non-GELU activations are left untouched
+    assert MLPLinear([3, 4], non_linearity=F.relu, gelu_approx=True).non_linearity is F.relu
@@ -1,10 +1,14 @@
 import inspect
 import torch
 import warnings
+import zipfile
 from pathlib import Path
 
 # Author: Jean Kossaifi
 
+# weights_only was added to torch.load in PyTorch 1.13, mmap in 2.1
+_torch_load_params = inspect.signature(torch.load).parameters
+
 class BaseModel(torch.nn.Module):
     """Based class for all Models
 
@@ -24,6 +28,7 @@ class BaseModel(torch.nn.Module):
     """
     _models = dict()
     _version = '0.1.0'
+    _name = 'BaseModel'
 
     def __init_subclass__(cls, name=None, **kwargs):
         """When a subclass is created, register it in _models
@@ -39,6 +44,17 @@ class BaseModel(torch.nn.Module):
             BaseModel._models[cls.__name__.lower()] = cls
             cls._name = cls.__name__
 
+        cls._cache_signature()
+
+    @classmethod
+    def _cache_signature(cls):
+        """The signature is fixed per class: inspect it once here rather than
+        on every instantiation in __new__
+        """
+        cls._cached_sig_params = dict(inspect.signature(cls).parameters)
+        cls._default_kwargs = {key: value.default for key, value in cls._cached_sig_params.items()
+                               if value.default is not inspect._empty}
+
     def __new__(cls, *args, **kwargs):
         """Verify arguments and save init kwargs for loading/saving
 
@@ -47,26 +63,26 @@ class BaseModel(torch.nn.Module):
 
         We store all the args and kwargs given so we can duplicate the instance transparently.
         """
-        sig = inspect.signature(cls)
+        sig_params = cls._cached_sig_params
         model_name = cls.__name__
 
         verbose = kwargs.get('verbose', False)
         # Verify that given parameters are actually arguments of the model
         for key in kwargs:
-            if key not in sig.parameters:
+            if key not in sig_params:
                 if verbose:
                     print(f"Given argument key={key} "
                         f"that is not in {model_name}'s signature.")
 
         # Check for model arguments not specified in the configuration
-        for key, value in sig.parameters.items():
-            if (value.default is not inspect._empty) and (key not in kwargs):
+        for key, default in cls._default_kwargs.items():
+            if key not in kwargs:
                 if verbose:
                     print(
                         f"Keyword argument {key} not specified for model {model_name}, "
-                        f"using default={value.default}."
+                        f"using default={default}."
                     )
-                kwargs[key] = value.default
+                kwargs[key] = default
 
         if hasattr(cls, '_version'):
             kwargs['_version'] = cls._version
@@ -95,14 +111,28 @@ class BaseModel(torch.nn.Module):
     def load_checkpoint(self, save_folder, save_name, map_location=None):
         save_folder = Path(save_folder)
         state_dict_filepath = save_folder.joinpath(f'{save_name}_state_dict.pt').as_posix()
-        self.load_state_dict(torch.load(state_dict_filepath, map_location=map_location))
+        # The state dict only holds tensors: memory-map it rather than reading
+        # the whole file in host memory before copying into the parameters.
+        # Only the zipfile format (default since PyTorch 1.6) can be memory-mapped
+        load_kwargs = dict()
+        if 'weights_only' in _torch_load_params:
+            load_kwargs['weights_only'] = True
+        if 'mmap' in _torch_load_params and zipfile.is_zipfile(state_dict_filepath):
+            load_kwargs['mmap'] = True
+        state_dict = torch.load(state_dict_filepath, map_location=map_location, **load_kwargs)
+        self.load_state_dict(state_dict)
     
     @classmethod
     def from_checkpoint(cls, save_folder, save_name, map_location=None):
         save_folder = Path(save_folder)
 
         metadata_filepath = save_folder.joinpath(f'{save_name}_metadata.pkl').as_posix()
-        init_kwargs = torch.load(metadata_filepath)
+        # init kwargs can hold arbitrary Python objects (e.g. F.gelu),
+        # they cannot be restricted to weights only
+        if 'weights_only' in _torch_load_params:
+            init_kwargs = torch.load(metadata_filepath, weights_only=False)
+        else:
+            init_kwargs = torch.load(metadata_filepath)
         # with open(metadata_filepath, 'r') as f:
         #     init_kwargs = json.load(f)
         
@@ -121,6 +151,10 @@ class BaseModel(torch.nn.Module):
         return instance
 
 
+# __init_subclass__ only runs for subclasses: cache BaseModel's own signature too
+BaseModel._cache_signature()
+
+
 def available_models():
     """List the available neural operators"""
     return list(BaseModel._models.keys())
@@ -148,7 +182,10 @@ def get_model(config):
     model : nn.Module
         the instanciated module
     """
-    arch = config["arch"].lower()
+    # models are registered by lowercase name: only lower the arch if needed
+    arch = config["arch"]
+    if arch not in BaseModel._models:
+        arch = arch.lower()
     config_arch = config.get(arch)
 
     # Set the number of input channels depending on channels in data + mg patching
@@ -0,0 +1,78 @@
+import inspect
+
+import torch
+from torch import nn
+import torch.nn.functional as F
+
+from ..base_model import BaseModel, get_model
+
+
+class DefaultsModel(BaseModel, name='DefaultsModel'):
+    def __init__(self, in_channels, hidden_channels=16, n_layers=2, non_linearity=F.gelu, **kwargs):
+        super().__init__()
+        self.fc = nn.Linear(in_channels, hidden_channels)
+
+    def forward(self, x):
+        return self.fc(x)
+
+
+def test_BaseModel_from_checkpoint(tmp_path):
+    model = DefaultsModel(3, hidden_channels=8)
+    model.save_checkpoint(tmp_path, 'model')
+
+    # init kwargs (incl. non_linearity) are restored, weights go through load_checkpoint
+    loaded = DefaultsModel.from_checkpoint(tmp_path, 'model')
+    assert loaded.fc.out_features == 8
+    assert loaded._init_kwargs['non_linearity'] is F.gelu
+
+    x = torch.randn(4, 3)
+    assert torch.equal(model(x), loaded(x))
+
+
+def test_BaseModel_load_legacy_checkpoint(tmp_path):
+    """State dicts in the pre-zipfile format cannot be memory-mapped but still load"""
+    model = DefaultsModel(3)
+    torch.save(model.state_dict(), tmp_path / 'model_state_dict.pt',
+               _use_new_zipfile_serialization=False)
+
+    loaded = DefaultsModel(3)
+    loaded.load_checkpoint(tmp_path, 'model')
+
+    x = torch.randn(4, 3)
+    assert torch.equal(model(x), loaded(x))
+
+
+def test_get_model_arch_case():
+    """Regression test: lowercase and mixed-case arch resolve to the same
+    model and config section (behaviour unchanged by skipping .lower())"""
+    models = []
+    for arch in ['defaultsmodel', 'DefaultsModel']:
+        config = {'arch': arch,
+                  'defaultsmodel': {'data_channels': 3, 'hidden_channels': 8}}
+        models.append(get_model(config))
+
+    for model in models:
+        assert type(model) is DefaultsModel
+        assert model.fc.in_features == 3
+        assert model.fc.out_features == 8
+
+
+def test_BaseModel_init_kwargs():
+    model = DefaultsModel(3, n_layers=4)
+
+    # Same kwargs as when inspecting the signature on every instantiation
+    expected = {'n_layers': 4}
+    for key, value in inspect.signature(DefaultsModel).parameters.items():
+        if value.default is not inspect._empty and key not in expected:
+            expected[key] = value.default
+    expected['_version'] = DefaultsModel._version
+    expected['args'] = (3,)
+    expected['_name'] = 'DefaultsModel'
+
+    assert model._init_kwargs == expected
+    assert model._init_kwargs['hidden_channels'] == 16
+
+
+def test_BaseModel_direct_instantiation():
+    model = BaseModel()
+    assert model._init_kwargs['args'] == ()